@@ -0,0 +1,105 @@
+"""
+BIDR Core
+---------
+Shared BIDR computation: log-RGB samples, the Illuminant Spectral Direction (ISD)
+and the cylinder axis joining the mean shadow and lit points.
+
+compute_bidr() caches its results as .npz files in the temp directory, keyed on a
+hash of the inputs, so re-runs and other scripts reuse them instead of recomputing.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+CACHE_DIR = tempfile.gettempdir()
+# Hashed into every cache key: bump whenever compute_bidr's maths changes,
+# so stale .npz files from an older version are never returned
+_CACHE_VERSION = 2
+
+def _cache_path(lit, shadow, n_steps):
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"v{_CACHE_VERSION}".encode())
+    for arr in (lit, shadow):
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    h.update(str(n_steps).encode())
+    return os.path.join(CACHE_DIR, f"bidr_{h.hexdigest()}.npz")
+
+def compute_bidr(lit, shadow, n_steps: int = 50, use_cache: bool = True):
+    """Return (lit_log, shadow_log, isd, cylinder) for matching lit/shadow RGB samples."""
+    if use_cache:
+        path = _cache_path(lit, shadow, n_steps)
+        if os.path.exists(path):
+            with np.load(path) as f:
+                return f["lit_log"], f["shadow_log"], f["isd"], f["cylinder"]
+
+    # Compute BIDR cylinder in log space
+    lit_log = np.log(lit)
+    shadow_log = np.log(shadow)
+    '''
+    Mechanics: Elementwise natural log of each RGB value (must be > 0).
+
+    Concept: In log-RGB, illumination and reflectance become additive rather than multiplicative. 
+    Under BIDR, each material’s lit→shadow trajectory becomes (almost) a straight line; 
+    different materials under the same A,D share the same direction (the ISD).
+    '''
+
+    # Axis direction (Estimate the Illuminant Spectral Direction)
+    isd = np.mean(lit_log - shadow_log, axis=0)
+    isd /= np.linalg.norm(isd)
+    '''
+    Mechanics:
+
+    lit_log - shadow_log is the vector from shadow to lit for each sample (row-wise).
+    np.mean(..., axis=0) averages those three vectors column-wise to reduce noise → a single 3-D direction.
+    np.linalg.norm(isd) computes its Euclidean length; dividing normalizes to unit length.
+
+    Concept:
+
+    The vector from log(shadow) to log(lit) approximates log(A+γD) change; 
+    its direction is the ISD for that illuminant pair.
+
+    Normalizing gives a pure direction (scale-free). This is the axis along which illumination varies; 
+    orthogonal directions capture reflectance chromaticity.
+
+    '''
+
+    # Generate cylinder points
+    t = np.linspace(0, 1, n_steps)
+    shadow_mean = shadow_log.mean(0)
+    direction = lit_log.mean(0) - shadow_mean
+    cylinder = np.empty((t.size, 3), dtype=lit_log.dtype)
+    np.add(np.einsum('i,j->ij', t, direction), shadow_mean, out=cylinder)
+    '''
+    Mechanics:
+
+    t = np.linspace(0,1,n_steps) creates n_steps scalars from 0→1 (50 by default).
+    shadow_log.mean(0) and lit_log.mean(0) are the mean shadow and mean lit points (3-D).
+    direction = lit_log.mean(0) - shadow_log.mean(0) is the mean direction from shadow to lit.
+    np.einsum('i,j->ij', t, direction) is the outer product t ⊗ direction, an n_steps×3 array of offsets;
+    adding shadow_mean (into a preallocated output) gives the n_steps×3 points.
+    For many materials at once, np.einsum('i,mj->mij', t, directions) batches the same contraction.
+
+    Concept:
+
+    This parameterizes the line segment from the average shadow point (t=0) to the average lit point (t=1) in log-RGB. 
+    In the ideal, all pixels of that material lie on this line; 
+    in real data they form a thin tube around it (the “cylinder”).
+    '''
+
+    if use_cache:
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                np.savez(fh, lit_log=lit_log, shadow_log=shadow_log, isd=isd, cylinder=cylinder)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return lit_log, shadow_log, isd, cylinder
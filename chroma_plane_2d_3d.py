@@ -1,38 +1,89 @@
 # ===== Add this to bidr_demo.py (or run standalone) =====
+import math
 import numpy as np
 import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+from figure_io import save_in_proc, join_all
+
+# Optional: numba fuses the per-point work into one parallel loop (numpy fallback otherwise)
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _to_log_rgb_numba(I, eps):
+        out = np.empty_like(I)
+        for i in prange(I.shape[0]):
+            for c in range(I.shape[1]):
+                out[i, c] = math.log(max(I[i, c], eps))
+        return out
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _project_onto_plane_numba(points, origin, u1, u2):
+        n = points.shape[0]
+        proj = np.empty_like(points)
+        a = np.empty(n, dtype=points.dtype)
+        b = np.empty(n, dtype=points.dtype)
+        for i in prange(n):
+            ai = 0.0
+            bi = 0.0
+            for c in range(3):
+                d = points[i, c] - origin[c]
+                ai += d * u1[c]
+                bi += d * u2[c]
+            a[i] = ai
+            b[i] = bi
+            for c in range(3):
+                proj[i, c] = origin[c] + ai * u1[c] + bi * u2[c]
+        return proj, a, b
 
 def to_log_rgb(I, eps: float = 1e-8):
-    return np.log(np.clip(I, eps, None))
+    if HAVE_NUMBA and I.ndim == 2:
+        return _to_log_rgb_numba(I, eps)
+    # One output buffer: floor at eps, then take the log in place
+    out = np.maximum(I, eps)
+    return np.log(out, out=out)
 
 def orthonormal_basis_from_vector(v):
-    v = v / (np.linalg.norm(v) + 1e-12)
-    # pick a helper not parallel to v
-    a = np.array([1.0, 0.0, 0.0]) if abs(v[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
-    u1 = a - np.dot(a, v) * v
-    u1 /= (np.linalg.norm(u1) + 1e-12)
-    u2 = np.cross(v, u1); u2 /= (np.linalg.norm(u2) + 1e-12)
-    return u1, u2
+    # pick the axis least aligned with v as a helper, so [v, a, v×a] has full rank
+    a = np.eye(3, dtype=v.dtype)[np.argmin(np.abs(v))]
+    M = np.column_stack([v, a, np.cross(v, a)])
+    # QR (Householder) orthonormalizes the columns; Q[:,0] ∥ v, the others span its orthogonal plane
+    Q, _ = np.linalg.qr(M)
+    return Q[:, 1], Q[:, 2]
 
 def project_onto_plane(points, origin, u1, u2):
     # Orthogonal projection: p_proj = origin + ((p-origin)·u1)u1 + ((p-origin)·u2)u2
+    if HAVE_NUMBA:
+        return _project_onto_plane_numba(points, origin, u1, u2)
+    # Stack the basis as a (3,2) matrix so both steps are a single matmul each
+    U = np.empty((3, 2), dtype=points.dtype)
+    U[:, 0] = u1; U[:, 1] = u2
     dp = points - origin
-    a = dp @ u1
-    b = dp @ u2
-    return origin + np.outer(a, u1) + np.outer(b, u2), a, b  # also return 2D coords (a,b)
+    ab = dp @ U
+    proj = origin + ab @ U.T
+    return proj, ab[:, 0], ab[:, 1]  # also return 2D coords (a,b)
 
 def demo_plane_visualization(seed: int = 7):
+    # Returns the background save processes; pass them to join_all()
+    procs = []
     rng = np.random.default_rng(seed)
 
     # Simulate one material across shadow→lit under a fixed (A,D)
-    A = np.array([0.25, 0.35, 0.95])   # ambient (bluish)
-    D = np.array([1.00, 0.95, 0.80])   # direct  (yellowish)
-    R  = np.array([0.55, 0.55, 0.55])  # gray asphalt-like
+    # float32 throughout: the result is only plotted, so double precision buys nothing
+    A = np.array([0.25, 0.35, 0.95], dtype=np.float32)   # ambient (bluish)
+    D = np.array([1.00, 0.95, 0.80], dtype=np.float32)   # direct  (yellowish)
+    R  = np.array([0.55, 0.55, 0.55], dtype=np.float32)  # gray asphalt-like
 
     n = 2000
-    g = rng.uniform(0, 1, n)                                # gamma
-    Rj = R + rng.normal(0, 0.02, (n, 3))                    # slight texture
-    I  = Rj * (A + g[:, None] * D) + rng.normal(0, 0.002, (n, 3))
+    g = rng.random(n, dtype=np.float32)                     # gamma ~ U[0,1)
+    z = rng.standard_normal((n, 6), dtype=np.float32)       # texture | sensor noise, one draw
+    Rj = R + 0.02 * z[:, :3]                                # slight texture
+    I  = Rj * (A + g[:, None] * D) + 0.002 * z[:, 3:]
     L  = to_log_rgb(I)                                      # log-RGB cloud
 
     # ISD (Illuminant Spectral Direction) and orthonormal basis of its orthogonal plane
@@ -47,59 +98,65 @@ def demo_plane_visualization(seed: int = 7):
     # Orthogonally project points onto the ISD-orthogonal plane
     L_proj, a2d, b2d = project_onto_plane(L, origin, u1, u2)
 
-    # ----- Build a visible plane patch (mesh) -----
+    # ----- Build a visible plane patch (one quad) -----
     # Span the plane based on the spread of projected points
-    amin, amax = np.percentile(a2d, [2, 98])
-    bmin, bmax = np.percentile(b2d, [2, 98])
+    # One call over both columns; ab is a throwaway copy, so it may be partitioned in place
+    ab = np.stack([a2d, b2d], axis=1)
+    pcts = np.percentile(ab, [2, 98], axis=0, method='lower', overwrite_input=True)
+    (amin, bmin), (amax, bmax) = pcts
     # Pad a little for nicer framing
     pad_a = 0.15 * (amax - amin + 1e-12)
     pad_b = 0.15 * (bmax - bmin + 1e-12)
-    agrid = np.linspace(amin - pad_a, amax + pad_a, 20)
-    bgrid = np.linspace(bmin - pad_b, bmax + pad_b, 20)
-    AA, BB = np.meshgrid(agrid, bgrid)
-    plane_pts = origin + np.outer(AA.ravel(), u1) + np.outer(BB.ravel(), u2)
-    XX = plane_pts[:, 0].reshape(AA.shape)
-    YY = plane_pts[:, 1].reshape(AA.shape)
-    ZZ = plane_pts[:, 2].reshape(AA.shape)
+    # The plane is flat, so its 4 corners are all matplotlib needs
+    coords = np.array([[amin - pad_a, bmin - pad_b],
+                       [amax + pad_a, bmin - pad_b],
+                       [amax + pad_a, bmax + pad_b],
+                       [amin - pad_a, bmax + pad_b]], dtype=L.dtype)
+    basis = np.stack([u1, u2], axis=0)                     # (2, 3)
+    corners = origin + coords @ basis
 
     # ----- Plot: plane + ISD vector + raw points + projected points -----
     fig = plt.figure(figsize=(9, 7))
     ax = fig.add_subplot(111, projection='3d')
 
     # Plane (semi-transparent)
-    ax.plot_surface(XX, YY, ZZ, alpha=0.25, linewidth=0, antialiased=True)
+    ax.add_collection3d(Poly3DCollection([corners], alpha=0.25, facecolor='C0', linewidth=0))
 
     # ISD arrow at plane origin (scaled for visibility)
     isd_len = 1.0
     p1 = origin
     p2 = origin + isd * isd_len
-    ax.plot([p1[0], p2[0]], [p1[1], p2[1]], [p1[2], p2[2]], linewidth=3, label='ISD vector')
+    ax.plot([p1[0], p2[0]], [p1[1], p2[1]], [p1[2], p2[2]], linewidth=3, color='C1', label='ISD vector')
 
+    # Point clouds are rasterized: vector output would emit one element per marker
     # Raw log-RGB point cloud
-    ax.scatter(L[:, 0], L[:, 1], L[:, 2], s=6, alpha=0.35, label='Log-RGB points')
+    ax.scatter(L[:, 0], L[:, 1], L[:, 2], s=6, alpha=0.35, label='Log-RGB points',
+               rasterized=True)
 
     # Projected points (dark) sitting on the plane
-    ax.scatter(L_proj[:, 0], L_proj[:, 1], L_proj[:, 2], s=5, alpha=0.8, label='Projected onto plane')
+    ax.scatter(L_proj[:, 0], L_proj[:, 1], L_proj[:, 2], s=5, alpha=0.8, label='Projected onto plane',
+               rasterized=True)
 
     ax.set_xlabel('log R'); ax.set_ylabel('log G'); ax.set_zlabel('log B')
     ax.set_title('ISD-orthogonal plane (illumination-invariant chromaticity)')
     ax.legend()
     fig.tight_layout()
-    fig.savefig('chromaticity_plane_3d.png', dpi=300, bbox_inches='tight')
+    procs.append(save_in_proc(fig, 'chromaticity_plane_3d.png', dpi=300, bbox_inches='tight'))
     plt.close(fig)
 
     # Optional: also save the 2-D chromaticity scatter (u1 vs u2)
     fig2 = plt.figure(figsize=(7, 6))
-    plt.scatter(a2d, b2d, s=8, alpha=0.6)
+    plt.scatter(a2d, b2d, s=8, alpha=0.6, rasterized=n > 500)
     plt.xlabel('u1 (ISD-orthogonal axis 1)')
     plt.ylabel('u2 (ISD-orthogonal axis 2)')
     plt.title('Illumination-invariant chromaticity (2-D plane coordinates)')
     fig2.tight_layout()
-    fig2.savefig('chromaticity_plane_2d.png', dpi=300, bbox_inches='tight')
+    procs.append(save_in_proc(fig2, 'chromaticity_plane_2d.png', dpi=300, bbox_inches='tight'))
     plt.close(fig2)
+    return procs
 
 if __name__ == "__main__":
-    demo_plane_visualization()
+    join_all(demo_plane_visualization())
     print("Saved figures:")
     print(" - chromaticity_plane_3d.png")
     print(" - chromaticity_plane_2d.png")
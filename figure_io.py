@@ -0,0 +1,43 @@
+"""
+Background Figure Saving
+------------------------
+PNG encoding of dpi=300 figures dominates the run time of the demo scripts.
+save_in_proc() pickles a finished figure and encodes it in a child process
+(matplotlib is not thread-safe), so the caller can move on to the next figure.
+
+Run any script with --singlecore to save serially in the main process instead.
+Scripts using this must keep their plotting code under `if __name__ == "__main__":`
+so that spawned children do not re-run it.
+"""
+
+import multiprocessing
+import pickle
+import sys
+
+SINGLECORE = "--singlecore" in sys.argv
+
+# spawn, not fork: forking after a threaded kernel (numba prange, BLAS) can deadlock the child.
+# Shared by every process/pool these scripts start.
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _savefig_worker(fig_bytes, path, kw):
+    fig = pickle.loads(fig_bytes)
+    fig.savefig(path, **kw)
+
+def save_in_proc(fig, path, **kw):
+    """Save `fig` to `path` in a child process; returns the Process (None if serial)."""
+    if SINGLECORE:
+        fig.savefig(path, **kw)
+        return None
+    p = MP_CONTEXT.Process(target=_savefig_worker, args=(pickle.dumps(fig), path, kw))
+    p.start()
+    return p
+
+def join_all(procs):
+    """Wait for every save started by save_in_proc and fail loudly if one crashed."""
+    for p in procs:
+        if p is None:
+            continue
+        p.join()
+        if p.exitcode != 0:
+            raise RuntimeError(f"figure save process exited with code {p.exitcode}")
@@ -20,104 +20,198 @@ Date: 2025-10-26
 import numpy as np
 import matplotlib.pyplot as plt
 import imageio.v2 as imageio
+import math
 import os
 
+from figure_io import MP_CONTEXT, SINGLECORE
+
+# ITU-R BT.601 luma weights, kept float32 so the grayscale matvec stays single precision
+GRAY_WEIGHTS = np.array([0.2989, 0.5870, 0.1140], dtype=np.float32)
+
+# zlib level for the processed PNGs: 1 encodes much faster than the default, still lossless
+PNG_COMPRESS_LEVEL = 1
+
 # ---------- Helper functions ----------
 def normalize01(arr):
-    arr = arr.astype(np.float32)
-    m, M = np.min(arr), np.max(arr)
-    return (arr - m) / (M - m + 1e-8)
+    # Works in place when arr is already float32 (the caller's array is overwritten)
+    arr = arr.astype(np.float32, copy=False)
+    m, M = float(arr.min()), float(arr.max())
+    inv = np.float32(1.0 / (M - m + 1e-8))
+    np.subtract(arr, np.float32(m), out=arr)
+    np.multiply(arr, inv, out=arr)
+    return arr
 
 def to_log_rgb(img, eps=1e-6):
-    log_img = np.log(img + eps)
+    # Single float32 buffer: add eps, then take the log in place
+    log_img = np.add(img, eps, dtype=np.float32)
+    np.log(log_img, out=log_img)
     return normalize01(log_img)
 
-# ---------- Load and prepare image ----------
-path = "outdoor_shadow.png"  # image file should be in the same directory as this script
-save_dir = "/Users/carolina1650/Bi-illumination-Dichromatic-Reflection/linear_log_outputs"
-os.makedirs(save_dir, exist_ok=True)
-
-img = imageio.imread(path).astype(np.float32) / 255.0
-linear_rgb = normalize01(img)
-log_rgb = to_log_rgb(linear_rgb)
-
-# ---------- Figure 1: Display comparison ----------
-plt.figure(figsize=(12,5))
-plt.subplot(1,2,1)
-plt.imshow(np.clip(linear_rgb, 0, 1))
-plt.title("Linear RGB (Radiance Proportional)")
-plt.axis('off')
-
-plt.subplot(1,2,2)
-plt.imshow(np.clip(log_rgb, 0, 1))
-plt.title("Log-RGB (Enhanced Shadows, Compressed Highlights)")
-plt.axis('off')
-plt.tight_layout()
-f1_path = os.path.join(save_dir, "figure1_linear_vs_log.png")
-plt.savefig(f1_path, dpi=300)
-plt.close()
-
-# ---------- Figure 2: Intensity profile comparison ----------
-gray_linear = np.dot(linear_rgb[..., :3], [0.2989, 0.5870, 0.1140])
-gray_log = np.dot(log_rgb[..., :3], [0.2989, 0.5870, 0.1140])
-
-row = gray_linear.shape[0] // 2
-x = np.arange(gray_linear.shape[1])
-
-plt.figure(figsize=(10,4))
-plt.plot(x, gray_linear[row, :], label='Linear RGB Intensity', color='orange')
-plt.plot(x, gray_log[row, :], label='Log-RGB Intensity', color='blue')
-plt.title("Intensity Profile Across Midline")
-plt.xlabel("Pixel Index (horizontal)")
-plt.ylabel("Normalized Intensity")
-plt.legend()
-plt.tight_layout()
-f2_path = os.path.join(save_dir, "figure2_intensity_profile.png")
-plt.savefig(f2_path, dpi=300)
-plt.close()
-
-# ---------- Figure 3: Mapping function comparison ----------
-xs = np.linspace(0, 1, 1000)
-ys_linear = xs
-ys_log = (np.log(xs + 1e-6) - np.log(1e-6)) / (np.log(1 + 1e-6) - np.log(1e-6))
-
-plt.figure(figsize=(6,4))
-plt.plot(xs, ys_linear, label="Linear")
-plt.plot(xs, ys_log, label="Log (normalized)")
-plt.title("Linear vs Log Mapping Curve")
-plt.xlabel("Input Intensity")
-plt.ylabel("Output (Display Intensity)")
-plt.legend()
-plt.tight_layout()
-f3_path = os.path.join(save_dir, "figure3_linear_vs_log_curve.png")
-plt.savefig(f3_path, dpi=300)
-plt.close()
-
-# ---------- Figure 4: Histogram comparison ----------
-plt.figure(figsize=(7,4))
-plt.hist(gray_linear.ravel(), bins=100, alpha=0.6, label='Linear RGB', color='orange')
-plt.hist(gray_log.ravel(), bins=100, alpha=0.6, label='Log-RGB', color='blue')
-plt.title("Histogram Comparison: Linear vs Log-RGB")
-plt.xlabel("Normalized Intensity")
-plt.ylabel("Pixel Count")
-plt.legend()
-plt.tight_layout()
-f4_path = os.path.join(save_dir, "figure4_histogram_comparison.png")
-plt.savefig(f4_path, dpi=300)
-plt.close()
-
-# ---------- Save images ----------
-linear_path = os.path.join(save_dir, "linear_rgb_image.png")
-log_path = os.path.join(save_dir, "log_rgb_image.png")
-imageio.imwrite(linear_path, (linear_rgb * 255).astype(np.uint8))
-imageio.imwrite(log_path, (log_rgb * 255).astype(np.uint8))
-
-# ---------- Summary ----------
-print("All figures and processed images saved to:")
-print(f"📁 {save_dir}\n")
-print(f"1️⃣ {f1_path}")
-print(f"2️⃣ {f2_path}")
-print(f"3️⃣ {f3_path}")
-print(f"4️⃣ {f4_path}")
-print(f"5️⃣ Linear RGB image: {linear_path}")
-print(f"6️⃣ Log RGB image: {log_path}")
+def to_uint8(arr):
+    # Scale [0,1] floats to bytes in one float32 scratch buffer, saturating instead of wrapping
+    tmp = np.multiply(arr, 255.0, dtype=np.float32)
+    np.clip(tmp, 0, 255, out=tmp)
+    return tmp.astype(np.uint8)
+
+def uint8_luts(raw, eps=1e-6):
+    """256-entry float32 tables giving normalize01 and to_log_rgb for each uint8 level of `raw`."""
+    lo, hi = int(raw.min()), int(raw.max())
+    levels = np.arange(256, dtype=np.float32) / 255.0
+    # Levels outside [lo, hi] never occur in raw; pin them so the min/max match the image
+    levels[:lo] = levels[lo]
+    levels[hi + 1:] = levels[hi]
+    lut_lin = normalize01(levels)
+    lut_log = to_log_rgb(lut_lin, eps)
+    return lut_lin, lut_log
+
+# ---------- Figure builders ----------
+# Each builder takes plain numpy arrays (picklable) and saves its own figure,
+# so the four of them can run side by side in a process pool.
+def make_fig1(linear_rgb, log_rgb, save_dir):
+    """Figure 1: side-by-side display of linear and log-RGB."""
+    # One scratch buffer for the clipped display copies (imshow keeps its own copy)
+    disp = np.empty_like(linear_rgb)
+
+    plt.figure(figsize=(12,5))
+    plt.subplot(1,2,1)
+    np.maximum(linear_rgb, 0.0, out=disp); np.minimum(disp, 1.0, out=disp)
+    plt.imshow(disp)
+    plt.title("Linear RGB (Radiance Proportional)")
+    plt.axis('off')
+
+    plt.subplot(1,2,2)
+    np.maximum(log_rgb, 0.0, out=disp); np.minimum(disp, 1.0, out=disp)
+    plt.imshow(disp)
+    plt.title("Log-RGB (Enhanced Shadows, Compressed Highlights)")
+    plt.axis('off')
+    plt.tight_layout()
+    f1_path = os.path.join(save_dir, "figure1_linear_vs_log.png")
+    plt.savefig(f1_path, dpi=300)
+    plt.close()
+    return f1_path
+
+def make_fig2(gray_linear, gray_log, save_dir):
+    """Figure 2: intensity profile along the middle row."""
+    row = gray_linear.shape[0] // 2
+    x = np.arange(gray_linear.shape[1])
+
+    plt.figure(figsize=(10,4))
+    plt.plot(x, gray_linear[row, :], label='Linear RGB Intensity', color='orange')
+    plt.plot(x, gray_log[row, :], label='Log-RGB Intensity', color='blue')
+    plt.title("Intensity Profile Across Midline")
+    plt.xlabel("Pixel Index (horizontal)")
+    plt.ylabel("Normalized Intensity")
+    plt.legend()
+    plt.tight_layout()
+    f2_path = os.path.join(save_dir, "figure2_intensity_profile.png")
+    plt.savefig(f2_path, dpi=300)
+    plt.close()
+    return f2_path
+
+def make_fig3(save_dir):
+    """Figure 3: linear vs normalized log mapping curve."""
+    xs = np.linspace(0, 1, 1000)
+    ys_linear = xs
+    # Scalar logs computed once; the curve itself is normalized in place
+    log_eps = math.log(1e-6)
+    inv_range = 1.0 / (math.log1p(1e-6) - log_eps)
+    ys_log = np.log(xs + 1e-6)
+    np.subtract(ys_log, log_eps, out=ys_log)
+    np.multiply(ys_log, inv_range, out=ys_log)
+
+    plt.figure(figsize=(6,4))
+    plt.plot(xs, ys_linear, label="Linear")
+    plt.plot(xs, ys_log, label="Log (normalized)")
+    plt.title("Linear vs Log Mapping Curve")
+    plt.xlabel("Input Intensity")
+    plt.ylabel("Output (Display Intensity)")
+    plt.legend()
+    plt.tight_layout()
+    f3_path = os.path.join(save_dir, "figure3_linear_vs_log_curve.png")
+    plt.savefig(f3_path, dpi=300)
+    plt.close()
+    return f3_path
+
+def make_fig4(gray_linear, gray_log, save_dir):
+    """Figure 4: intensity histograms."""
+    # Both images are normalized to [0,1], so one set of bin edges serves both histograms
+    edges = np.linspace(0, 1, 101, dtype=np.float32)
+    h_lin, _ = np.histogram(gray_linear, bins=edges)
+    h_log, _ = np.histogram(gray_log, bins=edges)
+    widths = np.diff(edges)
+
+    plt.figure(figsize=(7,4))
+    plt.bar(edges[:-1], h_lin, width=widths, align='edge', alpha=0.6, label='Linear RGB', color='orange')
+    plt.bar(edges[:-1], h_log, width=widths, align='edge', alpha=0.6, label='Log-RGB', color='blue')
+    plt.title("Histogram Comparison: Linear vs Log-RGB")
+    plt.xlabel("Normalized Intensity")
+    plt.ylabel("Pixel Count")
+    plt.legend()
+    plt.tight_layout()
+    f4_path = os.path.join(save_dir, "figure4_histogram_comparison.png")
+    plt.savefig(f4_path, dpi=300)
+    plt.close()
+    return f4_path
+
+def _call(fn, args):
+    return fn(*args)
+
+def save_images(linear_rgb, log_rgb, save_dir):
+    """Write the processed linear and log-RGB images; returns their paths."""
+    linear_path = os.path.join(save_dir, "linear_rgb_image.png")
+    log_path = os.path.join(save_dir, "log_rgb_image.png")
+    imageio.imwrite(linear_path, to_uint8(linear_rgb), compress_level=PNG_COMPRESS_LEVEL)
+    imageio.imwrite(log_path, to_uint8(log_rgb), compress_level=PNG_COMPRESS_LEVEL)
+    return linear_path, log_path
+
+def main():
+    # ---------- Load and prepare image ----------
+    path = "outdoor_shadow.png"  # image file should be in the same directory as this script
+    save_dir = "/Users/carolina1650/Bi-illumination-Dichromatic-Reflection/linear_log_outputs"
+    os.makedirs(save_dir, exist_ok=True)
+
+    raw = imageio.imread(path)
+    if raw.dtype == np.uint8:
+        # 8-bit input: run the pipeline on the 256 levels once, then gather per pixel
+        lut_lin, lut_log = uint8_luts(raw)
+        linear_rgb = lut_lin[raw]
+        log_rgb = lut_log[raw]
+    else:
+        img = raw.astype(np.float32) / 255.0
+        linear_rgb = normalize01(img)
+        log_rgb = to_log_rgb(linear_rgb)
+
+    gray_linear = linear_rgb[..., :3] @ GRAY_WEIGHTS
+    gray_log = log_rgb[..., :3] @ GRAY_WEIGHTS
+
+    # ---------- Figures 1-4 (independent, built in parallel) ----------
+    jobs = [
+        (make_fig1, (linear_rgb, log_rgb, save_dir)),
+        (make_fig2, (gray_linear, gray_log, save_dir)),
+        (make_fig3, (save_dir,)),
+        (make_fig4, (gray_linear, gray_log, save_dir)),
+    ]
+    if SINGLECORE:
+        fig_paths = [_call(fn, args) for fn, args in jobs]
+        linear_path, log_path = save_images(linear_rgb, log_rgb, save_dir)
+    else:
+        with MP_CONTEXT.Pool(len(jobs)) as pool:
+            pending = pool.starmap_async(_call, jobs)
+            # The processed images are written while the pool builds the figures
+            linear_path, log_path = save_images(linear_rgb, log_rgb, save_dir)
+            fig_paths = pending.get()
+    f1_path, f2_path, f3_path, f4_path = fig_paths
+
+    # ---------- Summary ----------
+    print("All figures and processed images saved to:")
+    print(f"📁 {save_dir}\n")
+    print(f"1️⃣ {f1_path}")
+    print(f"2️⃣ {f2_path}")
+    print(f"3️⃣ {f3_path}")
+    print(f"4️⃣ {f4_path}")
+    print(f"5️⃣ Linear RGB image: {linear_path}")
+    print(f"6️⃣ Log RGB image: {log_path}")
+
+
+if __name__ == "__main__":
+    main()